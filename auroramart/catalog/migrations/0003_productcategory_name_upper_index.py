@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-15 22:27
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_review'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productcategory',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='catalog_category_name_upper'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-15 22:29
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_product_count(apps, schema_editor):
+    ProductCategory = apps.get_model("catalog", "ProductCategory")
+    Product = apps.get_model("catalog", "Product")
+    counts = (
+        Product.objects.filter(category=OuterRef("pk"))
+        .order_by()
+        .values("category")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    ProductCategory.objects.update(product_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_productcategory_name_upper_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productcategory',
+            name='product_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='Number of products in this category, maintained by signals.'),
+        ),
+        migrations.RunPython(backfill_product_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-15 22:31
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_DOC_SQL = """
+CREATE OR REPLACE FUNCTION catalog_product_search_doc_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_doc := to_tsvector(
+        'english',
+        COALESCE(NEW.name, '') || ' ' || COALESCE(NEW.sku, '') || ' ' || COALESCE(NEW.description, '')
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER catalog_product_search_doc_trigger
+    BEFORE INSERT OR UPDATE ON catalog_product
+    FOR EACH ROW EXECUTE FUNCTION catalog_product_search_doc_update();
+
+UPDATE catalog_product SET search_doc = to_tsvector(
+    'english',
+    COALESCE(name, '') || ' ' || COALESCE(sku, '') || ' ' || COALESCE(description, '')
+);
+
+CREATE INDEX catalog_product_search_doc_gin ON catalog_product USING GIN (search_doc);
+CREATE INDEX catalog_product_sku_upper_like ON catalog_product (UPPER(sku) text_pattern_ops);
+"""
+
+DROP_SEARCH_DOC_SQL = """
+DROP INDEX IF EXISTS catalog_product_sku_upper_like;
+DROP INDEX IF EXISTS catalog_product_search_doc_gin;
+DROP TRIGGER IF EXISTS catalog_product_search_doc_trigger ON catalog_product;
+DROP FUNCTION IF EXISTS catalog_product_search_doc_update();
+"""
+
+
+def _run_on_postgresql(sql):
+    def run(apps, schema_editor):
+        # SQLite development databases keep using the icontains search path.
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_productcategory_product_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_doc',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Full-text document kept current by a PostgreSQL trigger.', null=True),
+        ),
+        migrations.RunPython(
+            _run_on_postgresql(SEARCH_DOC_SQL),
+            _run_on_postgresql(DROP_SEARCH_DOC_SQL),
+        ),
+    ]
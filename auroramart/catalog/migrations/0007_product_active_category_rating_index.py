@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-15 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_product_category_name_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-product_rating', '-quantity_on_hand'], name='catalog_prod_active_cat_rating'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-15 23:05
+
+from django.db import migrations
+
+WEIGHTED_SEARCH_DOC_SQL = """
+CREATE OR REPLACE FUNCTION catalog_product_search_doc_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_doc :=
+        setweight(to_tsvector('english', COALESCE(NEW.name, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(NEW.sku, '')), 'A')
+        || setweight(to_tsvector('english', COALESCE(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+UPDATE catalog_product SET search_doc =
+    setweight(to_tsvector('english', COALESCE(name, '')), 'A')
+    || setweight(to_tsvector('english', COALESCE(sku, '')), 'A')
+    || setweight(to_tsvector('english', COALESCE(description, '')), 'B');
+"""
+
+UNWEIGHTED_SEARCH_DOC_SQL = """
+CREATE OR REPLACE FUNCTION catalog_product_search_doc_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_doc := to_tsvector(
+        'english',
+        COALESCE(NEW.name, '') || ' ' || COALESCE(NEW.sku, '') || ' ' || COALESCE(NEW.description, '')
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+UPDATE catalog_product SET search_doc = to_tsvector(
+    'english',
+    COALESCE(name, '') || ' ' || COALESCE(sku, '') || ' ' || COALESCE(description, '')
+);
+"""
+
+
+def _run_on_postgresql(sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_product_active_category_rating_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run_on_postgresql(WEIGHTED_SEARCH_DOC_SQL),
+            _run_on_postgresql(UNWEIGHTED_SEARCH_DOC_SQL),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-15 23:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_weighted_product_search_doc'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-product_rating', '-quantity_on_hand'], name='catalog_prod_active_rating'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='catalog_prod_active_created'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.text import slugify
 
 
@@ -9,9 +11,19 @@ class ProductCategory(models.Model):
 
     name = models.CharField(max_length=128, unique=True)
     slug = models.SlugField(max_length=128, unique=True, editable=False)
+    product_count = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        help_text="Number of products in this category, maintained by signals.",
+    )
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            # Storefront resolves onboarding labels with name__iexact
+            models.Index(Upper("name"), name="catalog_category_name_upper"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -46,6 +58,17 @@ class ProductSubcategory(models.Model):
         return f"{self.category.name} :: {self.name}"
 
 
+class ProductManager(models.Manager):
+    """Default manager that leaves the full-text document out of loaded rows.
+
+    Only storefront search uses ``search_doc``, and it filters and ranks on it in
+    SQL, so no query needs the tsvector in Python.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer("search_doc")
+
+
 class Product(models.Model):
     """Single SKU that customers can browse and purchase."""
 
@@ -75,11 +98,38 @@ class Product(models.Model):
     quantity_on_hand = models.PositiveIntegerField(default=0)
     reorder_quantity = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    search_doc = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Full-text document kept current by a PostgreSQL trigger.",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductManager()
+
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["category", "name"], name="catalog_product_cat_name"),
+            # Partial index for "top active products in a category" queries
+            models.Index(
+                fields=["category", "-product_rating", "-quantity_on_hand"],
+                condition=models.Q(is_active=True),
+                name="catalog_prod_active_cat_rating",
+            ),
+            # Home page "trending" and "new arrivals" scan these and stop after a few rows
+            models.Index(
+                fields=["-product_rating", "-quantity_on_hand"],
+                condition=models.Q(is_active=True),
+                name="catalog_prod_active_rating",
+            ),
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(is_active=True),
+                name="catalog_prod_active_created",
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple string repr
         return f"{self.sku} – {self.name}"
@@ -0,0 +1,35 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Product, ProductCategory
+
+
+def _adjust_product_count(category_id, delta: int) -> None:
+    if category_id:
+        ProductCategory.objects.filter(pk=category_id).update(
+            product_count=F("product_count") + delta
+        )
+
+
+@receiver(post_init, sender=Product)
+def remember_product_category(sender, instance, **kwargs):
+    # Read through __dict__ so a deferred category_id never triggers a query
+    instance._original_category_id = instance.__dict__.get("category_id")
+
+
+@receiver(post_save, sender=Product)
+def update_count_on_product_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        _adjust_product_count(instance.category_id, 1)
+    elif update_fields is None or "category" in update_fields:
+        original_category_id = getattr(instance, "_original_category_id", None)
+        if original_category_id != instance.category_id:
+            _adjust_product_count(original_category_id, -1)
+            _adjust_product_count(instance.category_id, 1)
+    instance._original_category_id = instance.__dict__.get("category_id")
+
+
+@receiver(post_delete, sender=Product)
+def update_count_on_product_delete(sender, instance, **kwargs):
+    _adjust_product_count(instance.category_id, -1)
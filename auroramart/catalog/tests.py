@@ -1,3 +1,55 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import Product, ProductCategory
+
+
+class ProductCountTests(TestCase):
+    """ProductCategory.product_count is maintained by the catalog signals."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.books = ProductCategory.objects.create(name="Books")
+        cls.toys = ProductCategory.objects.create(name="Toys")
+
+    def _create_product(self, sku, category):
+        return Product.objects.create(
+            sku=sku, name=sku, category=category, unit_price=Decimal("9.99")
+        )
+
+    def _counts(self):
+        return dict(ProductCategory.objects.values_list("name", "product_count"))
+
+    def test_create_move_and_delete_update_counts(self):
+        product = self._create_product("BK-1", self.books)
+        self._create_product("BK-2", self.books)
+        self.assertEqual(self._counts(), {"Books": 2, "Toys": 0})
+
+        product.category = self.toys
+        product.save()
+        self.assertEqual(self._counts(), {"Books": 1, "Toys": 1})
+
+        product.delete()
+        self.assertEqual(self._counts(), {"Books": 1, "Toys": 0})
+
+    def test_saving_without_category_change_keeps_count(self):
+        product = self._create_product("BK-1", self.books)
+        product.name = "Renamed"
+        product.save()
+        self.assertEqual(self._counts()["Books"], 1)
+
+    def test_staff_dashboard_lists_top_categories(self):
+        self._create_product("BK-1", self.books)
+        self._create_product("BK-2", self.books)
+        self._create_product("TY-1", self.toys)
+        staff = User.objects.create_user("staff", password="pw12345!x", is_staff=True)
+        self.client.force_login(staff)
+
+        response = self.client.get(reverse("catalog:dashboard"))
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        top = [(c.name, c.product_count) for c in response.context["top_categories"]]
+        self.assertEqual(top, [("Books", 2), ("Toys", 1)])
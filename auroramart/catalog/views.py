@@ -4,7 +4,7 @@ from decimal import Decimal
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count, F, Q
+from django.db.models import F, Q
 from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
@@ -66,10 +66,8 @@ class StaffDashboardView(StaffRequiredMixin, generic.TemplateView):
         total_orders = Order.objects.count()
         recent_orders = Order.objects.order_by("-created_at")[:5]
         
-        # Category breakdown
-        category_stats = ProductCategory.objects.annotate(
-            product_count=Count("products")
-        ).order_by("-product_count")[:5]
+        # Category breakdown; product_count is kept current by catalog.signals
+        category_stats = ProductCategory.objects.order_by("-product_count")[:5]
         
         ctx.update({
             "total_products": total_products,
@@ -2,12 +2,26 @@ from decimal import Decimal
 from typing import Optional
 
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from django.utils.crypto import get_random_string
 
 from catalog.models import Product
 from .models import Basket, BasketItem, Order
 
 
+# Basket line columns, plus the product columns the cart and review pages and
+# basket recommendations read.
+BASKET_ITEM_FIELDS = (
+    "basket_id",
+    "quantity",
+    "unit_price",
+    "product__sku",
+    "product__name",
+    "product__quantity_on_hand",
+    "product__category_id",
+)
+
+
 def get_or_create_session_basket(request) -> Basket:
     basket_id = request.session.get("basket_id")
     basket: Optional[Basket] = None
@@ -22,6 +36,26 @@ def get_or_create_session_basket(request) -> Basket:
     return basket
 
 
+def get_basket_items(basket: Basket) -> list:
+    """Load basket lines with their products into the basket's prefetch cache.
+
+    ``Basket.subtotal`` and ``Basket.total_items`` iterate ``basket.items.all()``,
+    so templates that show the lines and totals share this single query. The
+    product's category is not joined because cart and review lines never show it;
+    only the product columns the templates and recommendations read are loaded.
+    """
+    prefetch_related_objects(
+        [basket],
+        Prefetch(
+            "items",
+            queryset=BasketItem.objects.select_related("product").only(
+                *BASKET_ITEM_FIELDS
+            ),
+        ),
+    )
+    return list(basket.items.all())
+
+
 def add_product_to_basket(basket: Basket, product: Product, quantity: int = 1):
     if product.quantity_on_hand <= 0:
         return
@@ -71,11 +105,15 @@ def remove_basket_item(item_id: int):
 @transaction.atomic
 def convert_basket_to_order(basket: Basket, shipping_data: dict, payment_data: dict, customer_profile=None):
     """Create an order from the basket and mark it as converted."""
-    if basket.is_converted or not basket.items.exists():
+    if basket.is_converted:
         return basket.order if hasattr(basket, "order") else None
+    # One query for the lines and their products also answers "is the basket empty?"
+    items = list(basket.items.select_related("product"))
+    if not items:
+        return None
 
     total_amount = Decimal("0.00")
-    for item in basket.items.all():
+    for item in items:
         total_amount += item.unit_price * item.quantity
         product = item.product
         if product.quantity_on_hand >= item.quantity:
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from catalog.models import Product
+from recommendations.services import warm_association_cache
+
+
+class Command(BaseCommand):
+    help = "Precompute association recommendations for every active SKU into the cache."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--sku",
+            action="append",
+            dest="skus",
+            help="Only warm the given SKU (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        products = Product.objects.filter(is_active=True).only("id", "sku", "category_id")
+        if options["skus"]:
+            products = products.filter(sku__in=options["skus"])
+
+        warmed = warm_association_cache(products.iterator())
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Recommendation cache warmed for {warmed} products.")
+        )
@@ -1,12 +1,16 @@
+import hashlib
 import logging
 from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Optional
 
 import joblib
+import numpy as np
 from django.conf import settings
+from django.core.cache import cache
 
 from catalog.models import Product, ProductCategory
+from storefront.caching import bump_version, current_version
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +18,23 @@ logger = logging.getLogger(__name__)
 DECISION_TREE_FILENAME = "b2c_customers_100.joblib"
 ASSOCIATION_RULES_FILENAME = "b2c_products_500_transactions_50k.joblib"
 
+# Precomputed per-SKU recommendations (product pks), see warm_recommendations.
+ASSOCIATION_CACHE_KEY = "assoc:{sku}"
+ASSOCIATION_CACHE_TTL = 24 * 3600
+ASSOCIATION_CACHE_SIZE = 12
+
+# Live results for multi-SKU baskets, keyed by limit and the sorted SKU set.
+ASSOCIATION_BASKET_KEY = "assoc:basket:v{version}:{limit}:{digest}"
+ASSOCIATION_BASKET_VERSION_KEY = "assoc:basket:version"
+ASSOCIATION_BASKET_TTL = 600
+MAX_BASKET_SKUS = 8
+
+# Number of highest-confidence rules whose consequents are used per basket SKU.
+TOP_RULES_PER_SKU = 5
+
+PREDICTION_CACHE_KEY = "predict:{digest}"
+PREDICTION_CACHE_TTL = 3600
+
 # Expected feature order for the onboarding model.
 ONBOARDING_FEATURES = [
     "age",
@@ -49,8 +70,119 @@ def get_association_rules():
     return _load_artifact(ASSOCIATION_RULES_FILENAME)
 
 
+@lru_cache(maxsize=1)
+def get_antecedent_index():
+    """Flatten rule antecedents into parallel int32 arrays for vectorised matching.
+
+    Returns ``(sku_ids, antecedent_ids, antecedent_rows)`` where ``sku_ids`` maps
+    each antecedent SKU to an integer id, and the two arrays hold that id and the
+    owning rule's row position for every antecedent element.
+    """
+    rules = get_association_rules()
+    if rules is None:
+        return None
+    sku_ids = {}
+    antecedent_ids = []
+    antecedent_rows = []
+    for row_position, antecedents in enumerate(rules["antecedents"]):
+        for sku in antecedents or ():
+            antecedent_ids.append(sku_ids.setdefault(sku, len(sku_ids)))
+            antecedent_rows.append(row_position)
+    return (
+        sku_ids,
+        np.asarray(antecedent_ids, dtype=np.int32),
+        np.asarray(antecedent_rows, dtype=np.int32),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_consequent_table():
+    """Map each antecedent SKU to the consequents of its top rules by confidence.
+
+    Scoring every rule is done once here with numpy, so a recommendation
+    request only needs a dict lookup per basket SKU.
+    """
+    index = get_antecedent_index()
+    if index is None:
+        return None
+    rules = get_association_rules()
+    sku_ids, antecedent_ids, antecedent_rows = index
+    sku_by_id = list(sku_ids)
+    confidence = rules["confidence"].to_numpy(dtype=np.float64)
+    consequents = rules["consequents"].tolist()
+
+    # Visit antecedent elements from the most to the least confident rule
+    order = np.argsort(-confidence[antecedent_rows], kind="stable")
+    rules_taken = np.zeros(len(sku_by_id), dtype=np.int32)
+    table = {}
+    for sku_id, row in zip(antecedent_ids[order].tolist(), antecedent_rows[order].tolist()):
+        if rules_taken[sku_id] >= TOP_RULES_PER_SKU:
+            continue
+        rules_taken[sku_id] += 1
+        table.setdefault(sku_by_id[sku_id], []).extend(consequents[row] or ())
+    return table
+
+
+def build_feature_row(onboarding_data: dict, features: Iterable[str] = ONBOARDING_FEATURES) -> tuple:
+    """Coerce onboarding answers into a model-ready row in ``features`` order."""
+    feature_row = []
+    for feature in features:
+        value = onboarding_data.get(feature)
+        if feature == "has_children":
+            value = int(bool(value))
+        elif feature == "monthly_income_sgd":
+            # Convert Decimal to float for sklearn compatibility
+            value = float(value) if value is not None else 0.0
+        feature_row.append(value)
+    return tuple(feature_row)
+
+
+def predict_from_row(feature_row: tuple) -> Optional[str]:
+    """Predict straight from a row built by ``build_feature_row``.
+
+    Returns None when the model is unavailable or expects a different
+    feature order, so callers can fall back to the dict-based prediction path.
+    """
+    model = get_decision_tree_model()
+    if not model:
+        return None
+    features = getattr(model, "feature_names_in_", ONBOARDING_FEATURES)
+    if list(features) != ONBOARDING_FEATURES:
+        return None
+    try:
+        return model.predict([list(feature_row)])[0]
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.error("Decision tree prediction failed: %s", exc)
+        return None
+
+
 def predict_preferred_category(onboarding_data: dict) -> Optional[str]:
-    """Return predicted preferred category label or None."""
+    """Return predicted preferred category label or None.
+
+    Predictions are memoised per feature row in-process and in the shared
+    cache, so identical onboarding answers skip the model entirely.
+    """
+    feature_row = onboarding_data.get("_feature_row") or build_feature_row(onboarding_data)
+    return _predict_for_row(feature_row)
+
+
+@lru_cache(maxsize=4096)
+def _predict_for_row(feature_row: tuple) -> Optional[str]:
+    digest = hashlib.md5(repr(feature_row).encode()).hexdigest()
+    onboarding_data = dict(zip(ONBOARDING_FEATURES, feature_row), _feature_row=feature_row)
+    return cache.get_or_set(
+        PREDICTION_CACHE_KEY.format(digest=digest),
+        lambda: _predict_uncached(onboarding_data),
+        PREDICTION_CACHE_TTL,
+    )
+
+
+def _predict_uncached(onboarding_data: dict) -> Optional[str]:
+    feature_row = onboarding_data.get("_feature_row")
+    if feature_row is not None:
+        prediction = predict_from_row(feature_row)
+        if prediction is not None:
+            return prediction
 
     model = get_decision_tree_model()
     if not model:
@@ -58,16 +190,10 @@ def predict_preferred_category(onboarding_data: dict) -> Optional[str]:
         return _heuristic_category_prediction(onboarding_data)
 
     try:
-        feature_row = []
-        for feature in getattr(model, "feature_names_in_", ONBOARDING_FEATURES):
-            value = onboarding_data.get(feature)
-            if feature == "has_children":
-                value = int(bool(value))
-            elif feature == "monthly_income_sgd":
-                # Convert Decimal to float for sklearn compatibility
-                value = float(value) if value is not None else 0.0
-            feature_row.append(value)
-        prediction = model.predict([feature_row])[0]
+        feature_row = build_feature_row(
+            onboarding_data, getattr(model, "feature_names_in_", ONBOARDING_FEATURES)
+        )
+        prediction = model.predict([list(feature_row)])[0]
         return prediction
     except Exception as exc:  # pragma: no cover - defensive
         logger.error("Decision tree prediction failed: %s", exc)
@@ -99,7 +225,8 @@ def recommend_associated_products(
         context_products: Optional list of Product objects for context-aware fallback
     """
 
-    basket_skus = list({sku for sku in basket_skus if sku})
+    # dict.fromkeys de-duplicates while keeping basket order intact
+    basket_skus = [sku for sku in dict.fromkeys(basket_skus) if sku]
     if not basket_skus:
         logger.info("No SKUs provided, using context-aware fallback")
         return _fallback_association_recommendations(basket_skus, limit, context_products)
@@ -109,32 +236,17 @@ def recommend_associated_products(
         logger.info("Association rules not loaded, using context-aware fallback")
         return _fallback_association_recommendations(basket_skus, limit, context_products)
 
-    # Query the DataFrame for rules where basket items are in antecedents
+    consequent_table = get_consequent_table()
+
+    # Look up the precomputed top-rule consequents for each basket SKU
     # Process ALL input SKUs to ensure variety in recommendations
     suggestions = []
     matched_count = 0
     for sku in basket_skus:
-        # Find rules where this SKU is in the antecedents
-        # Antecedents are frozensets, so we check membership
-        try:
-            matched_rules = rules[rules['antecedents'].apply(lambda x: sku in x if x else False)]
-        except Exception as e:
-            logger.warning(f"Error matching rules for SKU {sku}: {e}")
-            continue
-
-        if not matched_rules.empty:
+        consequents = consequent_table.get(sku)
+        if consequents:
             matched_count += 1
-            # Sort by confidence (highest first) and get consequents
-            top_rules = matched_rules.sort_values(by='confidence', ascending=False).head(5)
-
-            for _, row in top_rules.iterrows():
-                # Consequents are also frozensets, convert to list
-                try:
-                    consequents = list(row['consequents']) if row['consequents'] else []
-                    suggestions.extend(consequents)
-                except Exception as e:
-                    logger.warning(f"Error extracting consequents: {e}")
-                    continue
+            suggestions.extend(consequents)
 
     logger.info(f"Processed {len(basket_skus)} SKUs, {matched_count} had rules, {len(suggestions)} suggestions before dedup")
 
@@ -147,7 +259,9 @@ def recommend_associated_products(
             seen.add(sku)
 
     # Fetch products from database
-    products = list(Product.objects.filter(sku__in=unique_skus, is_active=True))
+    products = list(
+        Product.objects.select_related("category").filter(sku__in=unique_skus, is_active=True)
+    )
     
     # Reorder products to match unique_skus order (preserves confidence-based ordering)
     # Create a mapping of SKU to index in unique_skus
@@ -178,14 +292,19 @@ def _fallback_association_recommendations(
     If context_products provided, recommends products from same categories.
     Otherwise, returns diverse top-rated products.
     """
-    queryset = Product.objects.exclude(sku__in=basket_skus).filter(is_active=True)
+    queryset = (
+        Product.objects.select_related("category")
+        .exclude(sku__in=basket_skus)
+        .filter(is_active=True)
+    )
     
     # If we have context products, try to recommend from same categories
     if context_products:
-        categories = {p.category for p in context_products if p.category}
+        # Compare FK ids so context products never trigger a lazy category fetch
+        categories = {p.category_id for p in context_products if p.category_id}
         if categories:
             # Get products from same categories, ordered by rating
-            queryset = queryset.filter(category__in=categories).order_by(
+            queryset = queryset.filter(category_id__in=categories).order_by(
                 "-product_rating", "-quantity_on_hand", "-created_at"
             )
             products = list(queryset[:limit])
@@ -193,13 +312,18 @@ def _fallback_association_recommendations(
                 return products
             # If not enough, supplement with other categories
             needed = limit - len(products)
-            other_products = list(
-                Product.objects.exclude(sku__in=basket_skus + [p.sku for p in products])
-                .exclude(category__in=categories)
+            # Keep a single NOT IN on category in SQL and drop known SKUs in Python;
+            # over-fetching by the excluded count still guarantees enough rows.
+            excluded_skus = set(basket_skus) | {p.sku for p in products}
+            candidates = (
+                Product.objects.select_related("category")
                 .filter(is_active=True)
-                .order_by("-product_rating", "-quantity_on_hand", "-created_at")[:needed]
+                .exclude(category_id__in=categories)
+                .order_by("-product_rating", "-quantity_on_hand", "-created_at")[
+                    : needed + len(excluded_skus)
+                ]
             )
-            products.extend(other_products)
+            products.extend(p for p in candidates if p.sku not in excluded_skus)
             return products[:limit]
     
     # No context - return diverse top-rated products
@@ -207,3 +331,81 @@ def _fallback_association_recommendations(
     return list(
         queryset.order_by("-product_rating", "-quantity_on_hand", "-created_at")[:limit]
     )
+
+
+def warm_association_cache(products: Iterable[Product]) -> int:
+    """Store each product's recommendations as a pk list; returns the count warmed."""
+    warmed = 0
+    for product in products:
+        recommendations = recommend_associated_products(
+            [product.sku], limit=ASSOCIATION_CACHE_SIZE, context_products=[product]
+        )
+        cache.set(
+            ASSOCIATION_CACHE_KEY.format(sku=product.sku),
+            [p.pk for p in recommendations],
+            ASSOCIATION_CACHE_TTL,
+        )
+        warmed += 1
+    return warmed
+
+
+def get_cached_recommendations(
+    basket_skus: Iterable[str], limit: int = 4, context_products: Optional[List[Product]] = None
+) -> List[Product]:
+    """Serve recommendations from the cache, computing live on a miss.
+
+    SKUs are de-duplicated and capped at ``MAX_BASKET_SKUS``. A single SKU is
+    served from its warmed pk list (read-through on a miss). Warmed lists are
+    already padded, so they are never merged; multi-SKU baskets are computed
+    live and cached under the sorted SKU set, so any ordering of the same
+    basket shares one entry.
+    """
+    basket_skus = [sku for sku in dict.fromkeys(basket_skus) if sku][:MAX_BASKET_SKUS]
+    if not basket_skus or limit > ASSOCIATION_CACHE_SIZE:
+        return recommend_associated_products(basket_skus, limit, context_products)
+
+    if len(basket_skus) == 1:
+        key = ASSOCIATION_CACHE_KEY.format(sku=basket_skus[0])
+        pks = cache.get(key)
+        if pks is not None:
+            products = _hydrate_recommendations(pks, basket_skus)
+            if len(products) >= limit:
+                logger.debug("Recommendation cache hit for %s", basket_skus[0])
+                return products[:limit]
+        logger.debug("Recommendation cache miss for %s", basket_skus[0])
+        recommendations = recommend_associated_products(
+            basket_skus, ASSOCIATION_CACHE_SIZE, context_products
+        )
+        cache.set(key, [p.pk for p in recommendations], ASSOCIATION_CACHE_TTL)
+        return recommendations[:limit]
+
+    digest = hashlib.md5(",".join(sorted(basket_skus)).encode()).hexdigest()
+    version = current_version(ASSOCIATION_BASKET_VERSION_KEY)
+    basket_key = ASSOCIATION_BASKET_KEY.format(version=version, limit=limit, digest=digest)
+    pks = cache.get(basket_key)
+    if pks is not None:
+        products = _hydrate_recommendations(pks, basket_skus)
+        if len(products) == len(pks):
+            logger.debug("Recommendation cache hit (basket) for %d SKUs", len(basket_skus))
+            return products[:limit]
+
+    logger.debug("Recommendation cache miss (basket) for %d SKUs", len(basket_skus))
+    recommendations = recommend_associated_products(basket_skus, limit, context_products)
+    cache.set(basket_key, [p.pk for p in recommendations], ASSOCIATION_BASKET_TTL)
+    return recommendations
+
+
+def invalidate_basket_recommendations() -> None:
+    """Discard cached multi-SKU results; per-SKU warmed entries are left alone."""
+    bump_version(ASSOCIATION_BASKET_VERSION_KEY)
+
+
+def _hydrate_recommendations(pks: List[int], basket_skus: List[str]) -> List[Product]:
+    """Load active products for ``pks`` in order, skipping anything in the basket."""
+    products_by_pk = Product.objects.select_related("category").filter(is_active=True).in_bulk(pks)
+    basket = set(basket_skus)
+    return [
+        products_by_pk[pk]
+        for pk in pks
+        if pk in products_by_pk and products_by_pk[pk].sku not in basket
+    ]
@@ -0,0 +1,118 @@
+import hashlib
+
+from django.core.cache import cache
+
+from catalog.models import Product, ProductCategory
+
+# Home page sections change rarely, so they are served from the low-level cache.
+FEATURED_CATEGORIES_KEY = "home:featured_cats:v2"
+NEW_ARRIVALS_KEY = "home:new_arrivals:v1"
+TRENDING_PRODUCTS_KEY = "home:trending:v1"
+RECOMMENDED_PRODUCTS_KEY = "home:rec:{category_id}:v1"
+# Versions the shared anonymous home page response (HomeView.dispatch)
+HOME_PAGE_VERSION_KEY = "home:page:version"
+
+FEATURED_CATEGORIES_TTL = 600
+NEW_ARRIVALS_TTL = 300
+TRENDING_PRODUCTS_TTL = 600
+RECOMMENDED_PRODUCTS_TTL = 120
+
+# Cached products carry their category and subcategory names, so renaming
+# either bumps the version.
+PRODUCT_KEY = "prod:v{version}:{sku}"
+PRODUCT_VERSION_KEY = "prod:version"
+PRODUCT_TTL = 300
+
+# Onboarding label -> (id, name); the category signals bump the version.
+CATEGORY_BY_NAME_KEY = "cat:name:v{version}:{digest}"
+CATEGORY_BY_NAME_VERSION_KEY = "cat:name:version"
+CATEGORY_BY_NAME_TTL = 600
+
+
+def current_version(version_key: str) -> int:
+    """Current value of a namespace version counter, starting at 1."""
+    return cache.get_or_set(version_key, 1, None)
+
+
+def bump_version(version_key: str) -> None:
+    """Advance a version counter, orphaning every key built from the old value."""
+    cache.add(version_key, 1, None)
+    cache.incr(version_key)
+
+
+def cached_list(key: str, queryset, timeout: int) -> list:
+    """Return ``list(queryset)`` from the cache, evaluating it only on a miss."""
+    return cache.get_or_set(key, lambda: list(queryset), timeout)
+
+
+def invalidate_home_cache(*category_ids) -> None:
+    """Drop the home page sections, per-category recommendations and the
+    rendered anonymous home page.
+    """
+    keys = [FEATURED_CATEGORIES_KEY, NEW_ARRIVALS_KEY, TRENDING_PRODUCTS_KEY]
+    keys.extend(
+        RECOMMENDED_PRODUCTS_KEY.format(category_id=category_id)
+        for category_id in category_ids
+        if category_id
+    )
+    cache.delete_many(keys)
+    bump_version(HOME_PAGE_VERSION_KEY)
+
+
+def _product_key(sku: str) -> str:
+    return PRODUCT_KEY.format(version=current_version(PRODUCT_VERSION_KEY), sku=sku)
+
+
+def get_cached_product(sku: str):
+    """Return the active product for ``sku`` (or None), cached per SKU.
+
+    Misses are not cached, so requests for unknown SKUs never fill the cache.
+    """
+    key = _product_key(sku)
+    product = cache.get(key)
+    if product is None:
+        product = (
+            Product.objects.select_related("category", "subcategory")
+            .filter(sku=sku, is_active=True)
+            .first()
+        )
+        if product is not None:
+            cache.set(key, product, PRODUCT_TTL)
+    return product
+
+
+def invalidate_product_cache(sku: str) -> None:
+    cache.delete(_product_key(sku))
+
+
+def invalidate_all_product_caches() -> None:
+    """Discard every cached product, e.g. after a category rename."""
+    bump_version(PRODUCT_VERSION_KEY)
+
+
+def resolve_category_by_name(name_lower: str):
+    """Return ``(id, name)`` of the category matching ``name_lower``, or None.
+
+    Hits are kept in the shared cache under a version the category signals bump,
+    so every worker sees renames, deletions and new categories. Misses are not
+    cached.
+    """
+    digest = hashlib.md5(name_lower.encode()).hexdigest()
+    key = CATEGORY_BY_NAME_KEY.format(
+        version=current_version(CATEGORY_BY_NAME_VERSION_KEY), digest=digest
+    )
+    resolved = cache.get(key)
+    if resolved is None:
+        resolved = (
+            ProductCategory.objects.filter(name__iexact=name_lower)
+            .values_list("id", "name")
+            .first()
+        )
+        if resolved is not None:
+            cache.set(key, resolved, CATEGORY_BY_NAME_TTL)
+    return resolved
+
+
+def invalidate_category_names() -> None:
+    """Discard every cached label -> category resolution."""
+    bump_version(CATEGORY_BY_NAME_VERSION_KEY)
@@ -0,0 +1,31 @@
+"""Checkout progress (shipping, payment, last order number) kept in the session.
+
+All of it lives in one ``request.session["checkout"]`` dict, so each checkout
+step reads and writes a single key, and the state is as durable as the session
+itself rather than depending on an evictable cache.
+"""
+
+CHECKOUT_SESSION_KEY = "checkout"
+
+
+def get_checkout_state(request) -> dict:
+    return request.session.get(CHECKOUT_SESSION_KEY) or {}
+
+
+def update_checkout_state(request, state=None, **fields) -> dict:
+    """Merge ``fields`` into the stored state and write it back in one assignment.
+
+    Pass the ``state`` already returned by ``get_checkout_state`` to skip
+    re-reading it.
+    """
+    if state is None:
+        state = get_checkout_state(request)
+    state.update(fields)
+    # Reassigning the key marks the session modified so it is saved
+    request.session[CHECKOUT_SESSION_KEY] = state
+    return state
+
+
+def clear_checkout_state(request) -> dict:
+    """Remove and return the session's checkout state."""
+    return request.session.pop(CHECKOUT_SESSION_KEY, None) or {}
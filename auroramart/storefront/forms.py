@@ -1,6 +1,8 @@
 from django import forms
+from django.core.validators import MaxValueValidator
 
 from catalog.models import ProductCategory, ProductSubcategory
+from recommendations.services import build_feature_row
 
 
 class OnboardingForm(forms.Form):
@@ -47,6 +49,12 @@ class OnboardingForm(forms.Form):
         min_value=0, max_digits=10, decimal_places=2
     )
 
+    def clean(self):
+        cleaned_data = super().clean()
+        # Build the model input once so prediction can skip re-coercing fields
+        cleaned_data["_feature_row"] = build_feature_row(cleaned_data)
+        return cleaned_data
+
 
 class ProductFilterForm(forms.Form):
     q = forms.CharField(required=False, label="Search")
@@ -95,6 +103,14 @@ class ProductFilterForm(forms.Form):
 class AddToCartForm(forms.Form):
     quantity = forms.IntegerField(min_value=1, initial=1)
 
+    def __init__(self, *args, max_qty=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        quantity = self.fields["quantity"]
+        quantity.widget.attrs["max"] = max(max_qty, 1)
+        quantity.validators.append(
+            MaxValueValidator(max_qty, message=f"Only {max_qty} units available in stock.")
+        )
+
 
 class UpdateCartForm(forms.Form):
     line_id = forms.IntegerField()
@@ -0,0 +1,18 @@
+class ClearRecommendationsOnLogoutMiddleware:
+    """Delete the recommendations mode cookie on the response that logs a user out.
+
+    The flag lives in its own signed cookie rather than the session, so flushing
+    the session on logout would otherwise leave it for the next user of the
+    browser. ``storefront.signals`` marks the request on ``user_logged_out``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from .views import SHOW_RECOMMENDATIONS_COOKIE
+
+        response = self.get_response(request)
+        if getattr(request, "_logged_out", False) and SHOW_RECOMMENDATIONS_COOKIE in request.COOKIES:
+            response.delete_cookie(SHOW_RECOMMENDATIONS_COOKIE, samesite="Lax")
+        return response
@@ -0,0 +1,39 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from .caching import bump_version, current_version
+
+# Product saves and deletes bump the version.
+PRODUCT_COUNT_KEY = "plp:count:v{version}:{digest}"
+PRODUCT_COUNT_VERSION_KEY = "plp:count:version"
+PRODUCT_COUNT_TTL = 300
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that caches ``COUNT(*)`` per filtered query for a few minutes.
+
+    Listing pages only need the total for "Page X of Y", so caching it saves a
+    full count on every page render. ``invalidate_product_counts`` drops the
+    cached totals whenever products are added, changed or removed.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is None:
+            return super().count
+        digest = hashlib.md5(str(query).encode()).hexdigest()
+        version = current_version(PRODUCT_COUNT_VERSION_KEY)
+        return cache.get_or_set(
+            PRODUCT_COUNT_KEY.format(version=version, digest=digest),
+            lambda: Paginator.count.func(self),
+            PRODUCT_COUNT_TTL,
+        )
+
+
+def invalidate_product_counts() -> None:
+    """Discard every cached listing count."""
+    bump_version(PRODUCT_COUNT_VERSION_KEY)
@@ -0,0 +1,46 @@
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import Product, ProductCategory, ProductSubcategory
+from recommendations.services import invalidate_basket_recommendations
+
+from .caching import (
+    invalidate_all_product_caches,
+    invalidate_category_names,
+    invalidate_home_cache,
+    invalidate_product_cache,
+)
+from .pagination import invalidate_product_counts
+
+STOCK_ONLY_FIELDS = {"quantity_on_hand", "updated_at"}
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_caches_for_product(sender, instance, update_fields=None, **kwargs):
+    invalidate_home_cache(instance.category_id)
+    invalidate_product_cache(instance.sku)
+    # Stock decrements at checkout do not change which products are listed or
+    # recommended
+    if not update_fields or not set(update_fields) <= STOCK_ONLY_FIELDS:
+        invalidate_product_counts()
+        invalidate_basket_recommendations()
+
+
+@receiver([post_save, post_delete], sender=ProductCategory)
+def invalidate_home_cache_for_category(sender, instance, **kwargs):
+    invalidate_home_cache(instance.pk)
+    invalidate_all_product_caches()
+    invalidate_category_names()
+
+
+@receiver([post_save, post_delete], sender=ProductSubcategory)
+def invalidate_product_caches_for_subcategory(sender, instance, **kwargs):
+    invalidate_all_product_caches()
+
+
+@receiver(user_logged_out)
+def forget_recommendations_mode(sender, request, **kwargs):
+    # ClearRecommendationsOnLogoutMiddleware deletes the cookie on the response
+    if request is not None:
+        request._logged_out = True
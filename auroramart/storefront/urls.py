@@ -10,6 +10,11 @@ urlpatterns = [
     path("onboarding/", views.OnboardingView.as_view(), name="onboarding"),
     path("toggle-recommendations/", views.toggle_recommendations, name="toggle_recommendations"),
     path("products/", views.ProductListView.as_view(), name="product_list"),
+    path(
+        "products/explore/",
+        views.ExploreRecommendationsView.as_view(),
+        name="explore_recommendations",
+    ),
     path("products/<str:sku>/", views.ProductDetailView.as_view(), name="product_detail"),
     path("cart/", views.CartView.as_view(), name="cart"),
     path("checkout/shipping/", views.ShippingView.as_view(), name="checkout_shipping"),
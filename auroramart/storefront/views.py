@@ -1,24 +1,58 @@
 import logging
+import zlib
+from urllib.parse import urlencode
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q
-from django.http import JsonResponse
-from django.shortcuts import get_object_or_404, redirect, render
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    Prefetch,
+    Q,
+    Value,
+    When,
+    prefetch_related_objects,
+)
+from django.http import Http404, JsonResponse
+from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.views import View, generic
+from django.views.decorators.cache import cache_page
 from django.views.decorators.http import require_POST
 
 from catalog.models import Product, ProductCategory, ProductSubcategory
 from customers.models import CustomerProfile
 from orders import services as order_services
 from recommendations.services import (
+    get_cached_recommendations,
     predict_preferred_category,
-    recommend_associated_products,
 )
 
 logger = logging.getLogger(__name__)
 
+from .caching import (
+    FEATURED_CATEGORIES_KEY,
+    FEATURED_CATEGORIES_TTL,
+    HOME_PAGE_VERSION_KEY,
+    NEW_ARRIVALS_KEY,
+    NEW_ARRIVALS_TTL,
+    RECOMMENDED_PRODUCTS_KEY,
+    RECOMMENDED_PRODUCTS_TTL,
+    TRENDING_PRODUCTS_KEY,
+    TRENDING_PRODUCTS_TTL,
+    cached_list,
+    current_version,
+    get_cached_product,
+    resolve_category_by_name,
+)
+from .checkout_state import (
+    clear_checkout_state,
+    get_checkout_state,
+    update_checkout_state,
+)
 from .forms import (
     AddToCartForm,
     OnboardingForm,
@@ -27,81 +61,233 @@ from .forms import (
     ShippingAddressForm,
     UpdateCartForm,
 )
+from .pagination import CachedCountPaginator
+
+
+# Columns rendered by the product card templates; list cards also show stock
+# and subcategory. Keeps wide columns such as description out of listings.
+PRODUCT_CARD_FIELDS = ("sku", "name", "unit_price", "category__name")
+PRODUCT_LIST_FIELDS = PRODUCT_CARD_FIELDS + ("quantity_on_hand", "subcategory__name")
+
+SHOW_RECOMMENDATIONS_COOKIE = "show_rec"
+ANONYMOUS_HOME_TTL = 300
+
+# Cross-category products fetched to pad "explore other categories"
+EXPLORE_CANDIDATES = 40
+
+# toggle_recommendations only ever returns one of these two payloads
+TOGGLE_RESPONSES = {
+    True: {"success": True, "show_recommendations": True, "message": "Recommendations enabled"},
+    False: {"success": True, "show_recommendations": False, "message": "Showing all products"},
+}
+
+
+def _is_shared_home_request(request) -> bool:
+    return (
+        request.method == "GET"
+        and not request.GET
+        and request.user.is_anonymous
+        and not _show_recommendations(request)
+        and not request.session.get("onboarding_category")
+        and not len(messages.get_messages(request))
+    )
+
+
+def _show_recommendations(request) -> bool:
+    return request.get_signed_cookie(SHOW_RECOMMENDATIONS_COOKIE, default="0") == "1"
+
+
+def _set_show_recommendations(response, enabled: bool) -> None:
+    # A signed cookie keeps this flag out of the session, so toggling it never
+    # forces the session to be re-serialised and saved.
+    response.set_signed_cookie(
+        SHOW_RECOMMENDATIONS_COOKIE,
+        "1" if enabled else "0",
+        max_age=86400,
+        samesite="Lax",
+    )
+
+
+def _is_ajax(request) -> bool:
+    """XHR callers never see flashed messages, so there is no point building them."""
+    return request.headers.get("X-Requested-With") == "XMLHttpRequest"
+
+
+def _wants_json(request) -> bool:
+    return "application/json" in request.headers.get("Accept", "")
+
+
+def _get_onboarding_label(request):
+    """Onboarding label from the session, restored from the customer profile once.
+
+    Memoised on the request; the profile fallback reads just the label column
+    instead of loading the whole profile.
+    """
+    if not hasattr(request, "_onboarding_label"):
+        label = request.session.get("onboarding_category")
+        if not label and request.user.is_authenticated:
+            label = (
+                CustomerProfile.objects.filter(user_id=request.user.id)
+                .values_list("preferred_category_label", flat=True)
+                .first()
+            )
+            if label:
+                # Restore it to session for consistency
+                request.session["onboarding_category"] = label
+        request._onboarding_label = label
+    return request._onboarding_label
+
+
+def _get_onboarding_category(request):
+    """Resolve the session's onboarding category at most once per request.
+
+    Labels map to categories through ``resolve_category_by_name``, which is
+    shared by every worker and invalidated by the category signals, so a warm
+    cache answers without touching the database. Only the id and name are ever
+    read from the result.
+    """
+    label = request.session.get("onboarding_category") or ""
+    cached = getattr(request, "_onboarding_category", None)
+    if cached is None or cached[0] != label:
+        resolved = resolve_category_by_name(label.lower()) if label else None
+        category = ProductCategory(id=resolved[0], name=resolved[1]) if resolved else None
+        cached = (label, category)
+        request._onboarding_category = cached
+    return cached[1]
+
+
+def _get_predicted_category(request):
+    """The onboarding category, but only while ML recommendations are switched on."""
+    if _show_recommendations(request) and request.session.get("onboarding_category"):
+        return _get_onboarding_category(request)
+    return None
+
+
+def _resolve_category_pk(pk_str):
+    """Return the category named by a raw ``?category=`` value, or None."""
+    if not pk_str or not pk_str.isdigit():
+        return None
+    return ProductCategory.objects.only("id", "name").filter(pk=int(pk_str)).first()
+
+
+def _search_products(queryset, query):
+    """Filter ``queryset`` by a storefront search query.
+
+    PostgreSQL probes the GIN-indexed ``search_doc`` column (plus a SKU prefix
+    match) and orders by rank, so name and SKU hits come before description
+    hits; an explicit sort applied afterwards replaces that order. Other
+    backends fall back to substring matching.
+    """
+    if connection.vendor == "postgresql":
+        search_query = SearchQuery(query, config="english")
+        return (
+            queryset.filter(Q(search_doc=search_query) | Q(sku__istartswith=query))
+            .annotate(search_rank=SearchRank(F("search_doc"), search_query))
+            .order_by("-search_rank", "name")
+        )
+    return queryset.filter(
+        Q(name__icontains=query)
+        | Q(description__icontains=query)
+        | Q(sku__icontains=query)
+    )
 
 
 class HomeView(generic.TemplateView):
     template_name = "storefront/home.html"
 
+    def dispatch(self, request, *args, **kwargs):
+        # Anonymous visitors without personalisation all see the same page, which
+        # carries no CSRF token, so one rendered response is shared by all of
+        # them. _is_shared_home_request already checks every cookie-driven input,
+        # so the entry is not varied on the whole Cookie header.
+        if _is_shared_home_request(request):
+            key_prefix = f"home_anon:v{current_version(HOME_PAGE_VERSION_KEY)}"
+            view = cache_page(ANONYMOUS_HOME_TTL, key_prefix=key_prefix)(super().dispatch)
+            return view(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
 
         # Check if ML recommendations are enabled
-        show_recommendations = self.request.session.get('show_recommendations', False)
+        show_recommendations = _show_recommendations(self.request)
         ctx["show_recommendations"] = show_recommendations
 
         # Get onboarding category from session, or fallback to user's profile if available
-        onboarding_category = self.request.session.get('onboarding_category')
-        if not onboarding_category and self.request.user.is_authenticated:
-            try:
-                profile = self.request.user.customer_profile
-                if profile and profile.preferred_category_label:
-                    onboarding_category = profile.preferred_category_label
-                    # Restore it to session for consistency
-                    self.request.session['onboarding_category'] = onboarding_category
-            except CustomerProfile.DoesNotExist:
-                pass
+        onboarding_category = _get_onboarding_label(self.request)
         
         ctx["onboarding_category"] = onboarding_category
 
         # Always show featured categories
-        ctx["featured_categories"] = ProductCategory.objects.annotate(
-            product_count=Count("products")
-        ).order_by("-product_count")[:6]
+        ctx["featured_categories"] = cached_list(
+            FEATURED_CATEGORIES_KEY,
+            # Plain dicts pickle far cheaper than model instances
+            ProductCategory.objects.order_by("-product_count").values(
+                "id", "name", "product_count"
+            )[:6],
+            FEATURED_CATEGORIES_TTL,
+        )
+
+        trending_products = (
+            Product.objects.select_related("category")
+            .only(*PRODUCT_CARD_FIELDS)
+            .filter(is_active=True)
+            .order_by("-product_rating", "-quantity_on_hand")[:8]
+        )
 
         if show_recommendations and onboarding_category:
             # Show personalized recommendations based on predicted category
-            predicted_category = ProductCategory.objects.filter(
-                name__iexact=onboarding_category
-            ).first()
+            predicted_category = _get_onboarding_category(self.request)
 
             if predicted_category:
                 ctx["predicted_category"] = predicted_category
-                ctx["recommended_products"] = (
-                    Product.objects.filter(is_active=True, category=predicted_category)
-                    .order_by("-product_rating", "-quantity_on_hand")[:8]
+                # Keyed by category so every user with the same prediction shares hits
+                ctx["recommended_products"] = cached_list(
+                    RECOMMENDED_PRODUCTS_KEY.format(category_id=predicted_category.id),
+                    Product.objects.select_related("category")
+                    .only(*PRODUCT_CARD_FIELDS)
+                    .filter(is_active=True, category=predicted_category)
+                    .order_by("-product_rating", "-quantity_on_hand")[:8],
+                    RECOMMENDED_PRODUCTS_TTL,
                 )
             else:
                 # Fallback to trending if category not found
-                ctx["recommended_products"] = (
-                    Product.objects.filter(is_active=True)
-                    .order_by("-product_rating", "-quantity_on_hand")[:8]
+                ctx["recommended_products"] = cached_list(
+                    TRENDING_PRODUCTS_KEY, trending_products, TRENDING_PRODUCTS_TTL
                 )
         else:
             # Show generic trending products
-            ctx["trending_products"] = (
-                Product.objects.filter(is_active=True)
-                .order_by("-product_rating", "-quantity_on_hand")[:8]
+            ctx["trending_products"] = cached_list(
+                TRENDING_PRODUCTS_KEY, trending_products, TRENDING_PRODUCTS_TTL
             )
 
         # Always show new arrivals
-        ctx["new_arrivals"] = (
-            Product.objects.filter(is_active=True).order_by("-created_at")[:6]
+        ctx["new_arrivals"] = cached_list(
+            NEW_ARRIVALS_KEY,
+            Product.objects.select_related("category")
+            .only(*PRODUCT_CARD_FIELDS)
+            .filter(is_active=True)
+            .order_by("-created_at")[:6],
+            NEW_ARRIVALS_TTL,
         )
         return ctx
 
 
 @require_POST
 def toggle_recommendations(request):
-    """Toggle ML recommendation mode on/off."""
-    current_state = request.session.get('show_recommendations', False)
-    new_state = not current_state
-    request.session['show_recommendations'] = new_state
+    """Toggle ML recommendation mode on/off.
+
+    Posting ``state=true``/``state=false`` sets the mode instead, so retried
+    requests are idempotent; the cookie is only re-sent when the mode changes.
+    """
+    current_state = _show_recommendations(request)
+    state = request.POST.get("state")
+    new_state = state == "true" if state in ("true", "false") else not current_state
 
-    return JsonResponse({
-        'success': True,
-        'show_recommendations': new_state,
-        'message': 'Recommendations enabled' if new_state else 'Showing all products'
-    })
+    response = JsonResponse(TOGGLE_RESPONSES[new_state])
+    if new_state != current_state:
+        _set_show_recommendations(response, new_state)
+    return response
 
 
 class OnboardingView(generic.FormView):
@@ -113,11 +299,11 @@ class OnboardingView(generic.FormView):
         category_label = predict_preferred_category(onboarding_data)
         category = None
         if category_label:
-            category = ProductCategory.objects.filter(name__iexact=category_label).first()
+            resolved = resolve_category_by_name(category_label.lower())
+            if resolved:
+                category = ProductCategory(id=resolved[0], name=resolved[1])
             self.request.session["onboarding_category"] = category_label
-            # Automatically enable recommendations after onboarding
-            self.request.session["show_recommendations"] = True
-            if category:
+            if category and not _is_ajax(self.request):
                 messages.success(
                     self.request,
                     f"We think you'll love browsing {category.name}.",
@@ -145,37 +331,157 @@ class OnboardingView(generic.FormView):
             messages.info(
                 self.request, "Thanks! We'll show you our most popular products."
             )
-        url = reverse("storefront:product_list")
+        params = {}
         if category:
-            url += f"?category={category.id}&highlight={category.name.replace(' ', '+')}"
+            params.update(category=category.id, highlight=category.name)
         elif category_label:
-            url += f"?highlight={category_label.replace(' ', '+')}"
-        return redirect(url)
+            params["highlight"] = category_label
+        url = reverse("storefront:product_list")
+        response = redirect(f"{url}?{urlencode(params)}" if params else url)
+        if category_label:
+            # Automatically enable recommendations after onboarding
+            _set_show_recommendations(response, True)
+        return response
+
+
+def _next_best_action(page_products, current_category, predicted_category):
+    """Pick up to four "explore other categories" products for a listing page.
+
+    Association rules over the page's SKUs come first, padded with top products
+    from other categories; in ML mode the predicted category is favoured unless
+    the shopper is already browsing it.
+    """
+    # Use all products from current page for recommendations; reading sku
+    # off the loaded rows avoids a second values_list query
+    all_page_skus = [p.sku for p in page_products]
+    # Built once; every sku__in exclusion below extends this set
+    page_sku_set = frozenset(all_page_skus)
+
+    # Debug: Log the SKUs being used (first 10 for debugging)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Explore Other Categories - Page has %d products. First 10 SKUs: %s",
+            len(all_page_skus),
+            all_page_skus[:10],
+        )
+
+    # If no category filter from form, check if all products are from same category
+    if not current_category and page_products:
+        # Compare FK ids; the category rows were already joined into the page
+        if len({p.category_id for p in page_products}) == 1:
+            current_category = page_products[0].category
+
+    # Strategy for "nudge exploration": Show products from OTHER categories
+    if current_category:
+        # User is viewing a specific category - show products from OTHER categories
+        # Get MORE recommendations initially (12) so we have enough after filtering by category
+        next_best = get_cached_recommendations(all_page_skus, limit=12, context_products=page_products)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Got %d recommendations before category filter. Recommended SKUs: %s",
+                len(next_best),
+                [p.sku for p in next_best],
+            )
+            logger.info("Current category: %s", current_category.name)
+
+        # Filter to show products from OTHER categories (to encourage exploration)
+        next_best = [p for p in next_best if p.category_id != current_category.id]
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "After category filter: %d recommendations. SKUs: %s",
+                len(next_best),
+                [p.sku for p in next_best],
+            )
+
+        # If we don't have enough cross-category recommendations, add diverse products from other categories
+        if len(next_best) < 4:
+            # Use page products to create variety - hash the SKUs to get consistent but different results per page
+            # (crc32 is stable across worker processes, unlike hash())
+            page_hash = zlib.crc32(",".join(sorted(all_page_skus)).encode())
+
+            # One bounded fetch replaces count + offset slice + fallback slice;
+            # rotating it by the page hash keeps the variety per page
+            exclude_skus = page_sku_set.union(p.sku for p in next_best)
+            additional = list(
+                Product.objects.filter(is_active=True)
+                .exclude(category_id=current_category.id)
+                .exclude(sku__in=exclude_skus)
+                .select_related("category")
+                .only(*PRODUCT_CARD_FIELDS)
+                .order_by("category", "-product_rating", "-quantity_on_hand", "-created_at")[
+                    :EXPLORE_CANDIDATES
+                ]
+            )
+
+            if additional:
+                offset = page_hash % len(additional)
+                additional = additional[offset:] + additional[:offset]
+
+                # Take diverse products from different categories
+                seen_categories = {p.category_id for p in next_best}
+                diverse_products = []
+                for p in additional:
+                    if p.category_id not in seen_categories or len(diverse_products) < (4 - len(next_best)):
+                        diverse_products.append(p)
+                        seen_categories.add(p.category_id)
+                    if len(diverse_products) >= (4 - len(next_best)):
+                        break
+                next_best.extend(diverse_products)
+
+        # Limit to 4 for display
+        next_best = next_best[:4]
+    else:
+        # No specific category but filters applied (e.g., search query) - use association rules
+        next_best = get_cached_recommendations(all_page_skus, limit=4, context_products=page_products)
+
+    # If ML recommendations are ON, we can still respect it but prioritize exploration
+    if predicted_category:
+        # If viewing predicted category, still show other categories for exploration
+        # If viewing other categories, prioritize predicted category products
+        # Compare FK ids so recommended products never trigger a category fetch
+        if current_category and current_category.id == predicted_category.id:
+            # Already viewing predicted category - show other categories (exploration)
+            next_best = [p for p in next_best if p.category_id != predicted_category.id]
+        else:
+            # Viewing other category - show predicted category products (personalization)
+            predicted_products = [
+                p for p in next_best if p.category_id == predicted_category.id
+            ]
+            if predicted_products:
+                next_best = predicted_products[:4]
+            else:
+                # Add predicted category products if not in recommendations
+                exclude_skus = page_sku_set.union(p.sku for p in next_best)
+                additional = (
+                    Product.objects.select_related("category")
+                    .filter(is_active=True, category=predicted_category)
+                    .exclude(sku__in=exclude_skus)
+                    .only(*PRODUCT_CARD_FIELDS)
+                    .order_by("-product_rating", "-quantity_on_hand")[:4 - len(next_best)]
+                )
+                next_best = list(additional)[:4]
+
+    return next_best
 
 
 class ProductListView(generic.ListView):
     template_name = "storefront/product_list.html"
     context_object_name = "products"
     paginate_by = 20
+    paginator_class = CachedCountPaginator
 
     def get_queryset(self):
         queryset = (
             Product.objects.select_related("category", "subcategory")
+            .only(*PRODUCT_LIST_FIELDS)
             .filter(is_active=True)
             .order_by("name")
         )
 
-        # Check if ML recommendations are enabled
-        show_recommendations = self.request.session.get('show_recommendations', False)
-        onboarding_category = self.request.session.get('onboarding_category')
-
         # If recommendations enabled and category exists, filter by predicted category
-        if show_recommendations and onboarding_category:
-            predicted_category = ProductCategory.objects.filter(
-                name__iexact=onboarding_category
-            ).first()
-            if predicted_category:
-                queryset = queryset.filter(category=predicted_category)
+        predicted_category = _get_predicted_category(self.request)
+        if predicted_category:
+            queryset = queryset.filter(category=predicted_category)
 
         # Initialize form with GET parameters
         self.filter_form = ProductFilterForm(self.request.GET or None)
@@ -184,227 +490,150 @@ class ProductListView(generic.ListView):
         if not self.filter_form.data and self.request.GET.get("category"):
             self.filter_form = ProductFilterForm(initial={"category": self.request.GET.get("category")})
         
-        if self.filter_form.is_valid():
-            data = self.filter_form.cleaned_data
+        # Validated once here; get_context_data reads the same dict
+        self._cleaned = self.filter_form.cleaned_data if self.filter_form.is_valid() else None
+        if self._cleaned:
+            data = self._cleaned
             if data.get("q"):
-                queryset = queryset.filter(
-                    Q(name__icontains=data["q"])
-                    | Q(description__icontains=data["q"])
-                    | Q(sku__icontains=data["q"])
-                )
+                queryset = _search_products(queryset, data["q"])
             if data.get("category"):
                 queryset = queryset.filter(category=data["category"])
             if data.get("subcategory"):
                 queryset = queryset.filter(subcategory=data["subcategory"])
             if data.get("sort"):
                 queryset = queryset.order_by(data["sort"])
-        highlight = self.request.GET.get("highlight")
-        if highlight:
-            queryset = queryset.order_by(
-                "-category__name", "name"
-            )  # surface highlight results early
+        self._highlight = self.request.GET.get("highlight", "").replace("+", " ") or None
+        if self._highlight:
+            # Surface the highlighted category first with a cheap integer rank;
+            # iexact compiles to UPPER() and can use catalog_category_name_upper
+            queryset = queryset.annotate(
+                highlight_rank=Case(
+                    When(category__name__iexact=self._highlight, then=Value(0)),
+                    default=Value(1),
+                    output_field=IntegerField(),
+                )
+            ).order_by("highlight_rank", "name")
         return queryset
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         ctx["filter_form"] = self.filter_form
-        highlight = self.request.GET.get("highlight")
-        if highlight:
-            highlight = highlight.replace("+", " ")
-        ctx["highlight_category"] = highlight
+        ctx["highlight_category"] = self._highlight
         
         # Pass all subcategories for JavaScript filtering
-        ctx["all_subcategories"] = ProductSubcategory.objects.select_related("category").all()
+        ctx["all_subcategories"] = ProductSubcategory.objects.only("id", "name", "category_id")
 
         # Pass toggle state and onboarding data to template
-        show_recommendations = self.request.session.get('show_recommendations', False)
+        show_recommendations = _show_recommendations(self.request)
         ctx["show_recommendations"] = show_recommendations
         
         # Get onboarding category from session, or fallback to user's profile if available
-        onboarding_category = self.request.session.get('onboarding_category')
-        if not onboarding_category and self.request.user.is_authenticated:
-            try:
-                profile = self.request.user.customer_profile
-                if profile and profile.preferred_category_label:
-                    onboarding_category = profile.preferred_category_label
-                    # Restore it to session for consistency
-                    self.request.session['onboarding_category'] = onboarding_category
-            except CustomerProfile.DoesNotExist:
-                pass
+        onboarding_category = _get_onboarding_label(self.request)
         
         ctx["onboarding_category"] = onboarding_category
 
         # Add "Next best action" recommendations to nudge exploration
         # ONLY show when filters are applied (category, subcategory, or search)
+        # Evaluating the page here fills the queryset's result cache, so the
+        # template reuses these rows; they already carry only PRODUCT_LIST_FIELDS.
         page_products = list(ctx['products'])
         
         # Check if any filters are actually applied
         filters_applied = False
-        current_category = None
-        current_subcategory = None
-        search_query = None
+        current_category_id = None
         
-        if self.filter_form.is_valid():
-            data = self.filter_form.cleaned_data
-            current_category = data.get("category")
-            current_subcategory = data.get("subcategory")
-            search_query = data.get("q")
+        if self._cleaned:
+            data = self._cleaned
+            if data.get("category"):
+                current_category_id = data["category"].id
             
             # Check if any filter is actually set
-            if current_category or current_subcategory or search_query:
+            if data.get("category") or data.get("subcategory") or data.get("q"):
                 filters_applied = True
         
-        # Also check URL parameters directly (for category links from home page)
+        # Also check URL parameters directly (for category links from home page);
+        # the explore view resolves the raw id, so no lookup is needed here
         if not filters_applied:
-            if self.request.GET.get("category"):
+            category_param = self.request.GET.get("category")
+            if category_param:
                 filters_applied = True
-                if not current_category:
-                    try:
-                        current_category = ProductCategory.objects.get(pk=self.request.GET.get("category"))
-                    except (ProductCategory.DoesNotExist, ValueError):
-                        pass
+                if category_param.isdigit():
+                    current_category_id = int(category_param)
         
         if page_products and filters_applied:
-            # Use all products from current page for recommendations
-            all_page_skus = [p.sku for p in page_products]
-            
-            # Debug: Log the SKUs being used (first 10 for debugging)
-            logger.info(f"Explore Other Categories - Page has {len(all_page_skus)} products. First 10 SKUs: {all_page_skus[:10]}")
-            
-            # If no category filter from form, check if all products are from same category
-            if not current_category and page_products:
-                categories = {p.category for p in page_products}
-                if len(categories) == 1:
-                    current_category = list(categories)[0]
-            
-            # Strategy for "nudge exploration": Show products from OTHER categories
-            if current_category:
-                # User is viewing a specific category - show products from OTHER categories
-                # Get MORE recommendations initially (12) so we have enough after filtering by category
-                next_best = recommend_associated_products(all_page_skus, limit=12, context_products=page_products)
-                logger.info(f"Got {len(next_best)} recommendations before category filter. Recommended SKUs: {[p.sku for p in next_best]}")
-                logger.info(f"Current category: {current_category.name if current_category else None}")
-                
-                # Filter to show products from OTHER categories (to encourage exploration)
-                next_best = [p for p in next_best if p.category != current_category]
-                logger.info(f"After category filter: {len(next_best)} recommendations. SKUs: {[p.sku for p in next_best]}")
-                
-                # If we don't have enough cross-category recommendations, add diverse products from other categories
-                if len(next_best) < 4:
-                    # Use page products to create variety - hash the SKUs to get consistent but different results per page
-                    import hashlib
-                    page_hash = int(hashlib.md5(','.join(sorted(all_page_skus)).encode()).hexdigest()[:8], 16)
-                    
-                    # Get count of available products for offset calculation
-                    from django.db.models import Count
-                    total_count = Product.objects.filter(
-                        is_active=True
-                    ).exclude(
-                        category=current_category
-                    ).exclude(
-                        sku__in=[p.sku for p in next_best] + all_page_skus
-                    ).count()
-                    
-                    if total_count > 0:
-                        # Use hash to select different starting point for variety (max offset of 50)
-                        offset = min(page_hash % total_count, 50)
-                        
-                        # Get products with offset to vary selection based on page
-                        queryset = Product.objects.filter(
-                            is_active=True
-                        ).exclude(
-                            category=current_category
-                        ).exclude(
-                            sku__in=[p.sku for p in next_best] + all_page_skus
-                        ).order_by("category", "-product_rating", "-quantity_on_hand", "-created_at")
-                        
-                        # Try with offset first
-                        additional = list(queryset[offset:offset + 20])
-                        if len(additional) < 10:
-                            # If not enough, also try from beginning
-                            additional.extend(list(queryset[:20]))
-                        
-                        # Take diverse products from different categories
-                        seen_categories = {p.category for p in next_best}
-                        diverse_products = []
-                        for p in additional:
-                            if p.category not in seen_categories or len(diverse_products) < (4 - len(next_best)):
-                                diverse_products.append(p)
-                                seen_categories.add(p.category)
-                            if len(diverse_products) >= (4 - len(next_best)):
-                                break
-                        next_best.extend(diverse_products)
-                
-                # Limit to 4 for display
-                next_best = next_best[:4]
-            else:
-                # No specific category but filters applied (e.g., search query) - use association rules
-                next_best = recommend_associated_products(all_page_skus, limit=4, context_products=page_products)
-            
-            # If ML recommendations are ON, we can still respect it but prioritize exploration
-            if show_recommendations and self.request.session.get('onboarding_category'):
-                predicted_category = ProductCategory.objects.filter(
-                    name__iexact=self.request.session.get('onboarding_category')
-                ).first()
-                
-                # If viewing predicted category, still show other categories for exploration
-                # If viewing other categories, prioritize predicted category products
-                if predicted_category:
-                    if current_category == predicted_category:
-                        # Already viewing predicted category - show other categories (exploration)
-                        next_best = [p for p in next_best if p.category != predicted_category]
-                    else:
-                        # Viewing other category - show predicted category products (personalization)
-                        predicted_products = [
-                            p for p in next_best if p.category == predicted_category
-                        ]
-                        if predicted_products:
-                            next_best = predicted_products[:4]
-                        else:
-                            # Add predicted category products if not in recommendations
-                            additional = (
-                                Product.objects.filter(
-                                    is_active=True,
-                                    category=predicted_category
-                                )
-                                .exclude(sku__in=[p.sku for p in next_best] + all_page_skus)
-                                .order_by("-product_rating", "-quantity_on_hand")[:4 - len(next_best)]
-                            )
-                            next_best = list(additional)[:4]
-            
-            ctx["next_best_action"] = next_best
-            ctx["current_category"] = current_category  # Pass to template for conditional display
-        else:
-            # No filters applied - don't show next best action
-            ctx["next_best_action"] = None
-            ctx["current_category"] = None
+            # The suggestions are fetched after the page renders, keeping the
+            # recommender and padding queries off the listing's critical path
+            params = {"skus": ",".join(p.sku for p in page_products)}
+            if current_category_id:
+                params["category"] = current_category_id
+            ctx["next_best_action_url"] = (
+                f"{reverse('storefront:explore_recommendations')}?{urlencode(params)}"
+            )
 
         return ctx
 
 
+class ExploreRecommendationsView(View):
+    """Render the "Explore other categories" block for one product-list page."""
+
+    template_name = "storefront/_next_best_action.html"
+
+    def get(self, request):
+        skus = [sku for sku in request.GET.get("skus", "").split(",") if sku]
+        skus = skus[: ProductListView.paginate_by]
+        products_by_sku = (
+            Product.objects.select_related("category")
+            .only(*PRODUCT_CARD_FIELDS)
+            .filter(sku__in=skus, is_active=True)
+            .in_bulk(field_name="sku")
+        )
+        page_products = [products_by_sku[sku] for sku in skus if sku in products_by_sku]
+        next_best = None
+        if page_products:
+            category_param = request.GET.get("category")
+            predicted_category = _get_predicted_category(request)
+            if predicted_category and str(predicted_category.id) == category_param:
+                current_category = predicted_category
+            else:
+                current_category = _resolve_category_pk(category_param)
+            next_best = _next_best_action(page_products, current_category, predicted_category)
+        return render(request, self.template_name, {"next_best_action": next_best})
+
+
 class ProductDetailView(View):
     template_name = "storefront/product_detail.html"
 
+    def _get_product(self, sku):
+        product = get_cached_product(sku)
+        if product is None:
+            raise Http404("No Product matches the given query.")
+        return product
+
     def get(self, request, sku):
         from catalog.forms import ReviewForm
         from catalog.models import Review
         
-        product = get_object_or_404(
-            Product.objects.select_related("category", "subcategory"),
-            sku=sku,
-            is_active=True,
-        )
-        form = AddToCartForm()
-        form.fields["quantity"].widget.attrs["max"] = max(product.quantity_on_hand, 1)
-        recommendations = recommend_associated_products([product.sku], limit=4, context_products=[product])
+        product = self._get_product(sku)
+        form = AddToCartForm(max_qty=product.quantity_on_hand)
+        recommendations = get_cached_recommendations([product.sku], limit=4, context_products=[product])
         
-        # Get reviews for this product
-        reviews = Review.objects.filter(product=product).select_related("user").order_by("-created_at")
+        # Get reviews for this product; the template only shows the author's username
+        prefetch_related_objects(
+            [product],
+            Prefetch(
+                "reviews",
+                queryset=Review.objects.select_related("user")
+                .only("product_id", "rating", "comment", "created_at", "user__username")
+                .order_by("-created_at"),
+                to_attr="prefetched_reviews",
+            ),
+        )
+        reviews = product.prefetched_reviews
         
         # Check if current user has already reviewed
         user_review = None
         if request.user.is_authenticated:
-            user_review = reviews.filter(user=request.user).first()
+            user_review = next((r for r in reviews if r.user_id == request.user.id), None)
         
         # Review form for authenticated users who haven't reviewed yet
         review_form = ReviewForm() if request.user.is_authenticated and not user_review else None
@@ -423,23 +652,20 @@ class ProductDetailView(View):
         )
 
     def post(self, request, sku):
-        product = get_object_or_404(
-            Product.objects.select_related("category", "subcategory"),
-            sku=sku,
-            is_active=True,
-        )
-        form = AddToCartForm(request.POST)
-        form.fields["quantity"].widget.attrs["max"] = max(product.quantity_on_hand, 1)
+        product = self._get_product(sku)
+        form = AddToCartForm(request.POST, max_qty=product.quantity_on_hand)
         if form.is_valid():
             quantity = form.cleaned_data["quantity"]
-            if quantity > product.quantity_on_hand:
-                form.add_error("quantity", f"Only {product.quantity_on_hand} units available in stock.")
-            else:
-                basket = order_services.get_or_create_session_basket(request)
-                order_services.add_product_to_basket(basket, product, quantity)
+            basket = order_services.get_or_create_session_basket(request)
+            order_services.add_product_to_basket(basket, product, quantity)
+            if _wants_json(request):
+                return JsonResponse({"success": True, "sku": product.sku, "quantity": quantity})
+            if not _is_ajax(request):
                 messages.success(request, f"{product.name} added to your cart.")
-                return redirect("storefront:cart")
-        recommendations = recommend_associated_products([product.sku], limit=4, context_products=[product])
+            return redirect("storefront:cart")
+        if _wants_json(request):
+            return JsonResponse({"success": False, "errors": form.errors}, status=400)
+        recommendations = get_cached_recommendations([product.sku], limit=4, context_products=[product])
         return render(
             request,
             self.template_name,
@@ -452,12 +678,14 @@ class CartView(View):
 
     def get(self, request):
         basket = order_services.get_or_create_session_basket(request)
-        items = basket.items.select_related("product")
+        # Evaluate once; the emptiness check, SKU list, totals and template all reuse it
+        items = order_services.get_basket_items(basket)
         recommendations = None
         # Only show "Complete the set" recommendations if cart has items
-        if items.exists():
+        if items:
             item_products = [item.product for item in items]
-            recommendations = recommend_associated_products(
+            # Cached by SKU set, so refreshes and quantity-only changes skip the rule lookup
+            recommendations = get_cached_recommendations(
                 [item.product.sku for item in items], limit=4, context_products=item_products
             )
         update_form = UpdateCartForm()
@@ -476,16 +704,21 @@ class CartView(View):
         # Check if this is an add to cart request from "Complete the set"
         if "add_product_sku" in request.POST:
             sku = request.POST.get("add_product_sku")
-            try:
-                product = Product.objects.get(sku=sku, is_active=True)
-                if product.quantity_on_hand > 0:
-                    basket = order_services.get_or_create_session_basket(request)
-                    order_services.add_product_to_basket(basket, product, quantity=1)
-                    messages.success(request, f"{product.name} added to your cart.")
-                else:
-                    messages.error(request, f"{product.name} is out of stock.")
-            except Product.DoesNotExist:
+            # Only the columns the stock check, basket line and message read
+            product = (
+                Product.objects.only("sku", "name", "unit_price", "quantity_on_hand")
+                .filter(sku=sku, is_active=True)
+                .first()
+            )
+            if product is None:
                 messages.error(request, "Product not found.")
+            elif product.quantity_on_hand > 0:
+                basket = order_services.get_or_create_session_basket(request)
+                order_services.add_product_to_basket(basket, product, quantity=1)
+                if not _is_ajax(request):
+                    messages.success(request, f"{product.name} added to your cart.")
+            else:
+                messages.error(request, f"{product.name} is out of stock.")
             return redirect("storefront:cart")
         
         # Check if this is a delete request
@@ -524,7 +757,7 @@ class ShippingView(LoginRequiredMixin, View):
     login_url = "customers:login"
 
     def get(self, request):
-        initial = request.session.get("checkout_shipping", {})
+        initial = get_checkout_state(request).get("shipping", {})
         
         # If no session data, try to pre-populate from user's profile
         if not initial and request.user.is_authenticated:
@@ -548,7 +781,7 @@ class ShippingView(LoginRequiredMixin, View):
     def post(self, request):
         form = self.form_class(request.POST)
         if form.is_valid():
-            request.session["checkout_shipping"] = form.cleaned_data
+            update_checkout_state(request, shipping=form.cleaned_data)
             return redirect("storefront:checkout_payment")
         return render(request, self.template_name, {"form": form})
 
@@ -559,7 +792,7 @@ class PaymentView(LoginRequiredMixin, View):
     login_url = "customers:login"
 
     def get(self, request):
-        initial = request.session.get("checkout_payment", {})
+        initial = get_checkout_state(request).get("payment", {})
         form = self.form_class(initial=initial)
         return render(request, self.template_name, {"form": form})
 
@@ -569,7 +802,7 @@ class PaymentView(LoginRequiredMixin, View):
             payment_data = form.cleaned_data.copy()
             payment_data["card_number"] = str(payment_data["card_number"])
             payment_data["cvv"] = "***"
-            request.session["checkout_payment"] = payment_data
+            update_checkout_state(request, payment=payment_data)
             return redirect("storefront:checkout_review")
         return render(request, self.template_name, {"form": form})
 
@@ -580,21 +813,24 @@ class ReviewView(LoginRequiredMixin, View):
 
     def get(self, request):
         basket = order_services.get_or_create_session_basket(request)
-        if not basket.items.exists():
+        items = order_services.get_basket_items(basket)
+        if not items:
             messages.error(request, "Your cart is empty.")
             return redirect("storefront:product_list")
+        state = get_checkout_state(request)
         context = {
             "basket": basket,
-            "items": basket.items.select_related("product"),
-            "shipping": request.session.get("checkout_shipping", {}),
-            "payment": request.session.get("checkout_payment", {}),
+            "items": items,
+            "shipping": state.get("shipping", {}),
+            "payment": state.get("payment", {}),
         }
         return render(request, self.template_name, context)
 
     def post(self, request):
         basket = order_services.get_or_create_session_basket(request)
-        shipping = request.session.get("checkout_shipping")
-        payment = request.session.get("checkout_payment")
+        state = get_checkout_state(request)
+        shipping = state.get("shipping")
+        payment = state.get("payment")
         if not (shipping and payment):
             messages.error(request, "Please complete the checkout steps.")
             return redirect("storefront:checkout_shipping")
@@ -609,8 +845,7 @@ class ReviewView(LoginRequiredMixin, View):
         
         order = order_services.convert_basket_to_order(basket, shipping, payment, customer_profile=customer_profile)
         order_services.clear_basket_session(request)
-        request.session["checkout_shipping"] = shipping
-        request.session["last_order_number"] = order.order_number if order else ""
+        update_checkout_state(request, state, order_number=order.order_number if order else "")
         return redirect("storefront:checkout_complete")
 
 
@@ -620,7 +855,7 @@ class ConfirmationView(LoginRequiredMixin, generic.TemplateView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        ctx["shipping"] = self.request.session.pop("checkout_shipping", {})
-        ctx["order_number"] = self.request.session.pop("last_order_number", "")
-        self.request.session.pop("checkout_payment", None)
+        state = clear_checkout_state(self.request)
+        ctx["shipping"] = state.get("shipping", {})
+        ctx["order_number"] = state.get("order_number", "")
         return ctx